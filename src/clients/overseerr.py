@@ -1,34 +1,39 @@
 """Module for interacting with the Overseerr API."""
+from concurrent.futures import ThreadPoolExecutor
 import requests
 from retry import retry
 from src.logger import logger
+from src.util import RESPONSE_BODY_ERRORS, check_response, create_session, decode_json
+
+MAX_WORKERS = 8
 
 class OverseerrClient:
     """
     Class for interacting with the Overseerr API.
     """
-    def __init__(self, config):
+    def __init__(self, config, adapter=None):
         self.config = config
         self.api_key = config.overseerr.api_key
         self.base_url = config.overseerr.base_url
         self.fetch_limit = config.overseerr.fetch_limit
+        self._session = create_session(self.api_key, adapter)
 
+    @retry(RESPONSE_BODY_ERRORS, tries=3, delay=5)
     def __get_media(self):
         url = f"{self.base_url}/media"
-        headers = {"X-API-KEY": self.api_key}
         params = {"take": self.fetch_limit, "skip": 0}
 
         media_list = []
 
         for _ in range(1000):
-            response = requests.get(url, headers=headers, params=params, timeout=30)
-            if response.status_code != 200:
-                raise requests.exceptions.RequestException(f"{response.url} : {response.status_code} - {response.text}")
+            response = self._session.get(url, params=params)
+            check_response(response)
             
-            if not response.json().get("results", []):
+            results = decode_json(response).get("results", [])
+            if not results:
                 break
             
-            media_list.extend(response.json().get("results", []))
+            media_list.extend(results)
 
             params["skip"] += self.fetch_limit
 
@@ -36,13 +41,17 @@ class OverseerrClient:
 
     def __delete_media(self, media_id: int):
         url = f"{self.base_url}/media/{media_id}"
-        headers = {"X-API-KEY": self.api_key}
 
-        response = requests.delete(url, headers=headers, timeout=30)
-        if response.status_code != 204:
-            raise requests.exceptions.RequestException(f"{response.url} : {response.status_code} - {response.text}")
+        response = self._session.delete(url)
+        check_response(response)
+
+    def __delete_item(self, item, media_title):
+        try:
+            self.__delete_media(item.get("id"))
+            logger.info("[OVERSEERR] Deleted %s.", media_title)
+        except requests.exceptions.RequestException as err:
+            logger.error("[OVERSEERR] Failed to delete %s. Error: %s", media_title, err)
 
-    @retry(tries=3, delay=5)
     def get_and_delete_media(self, media_to_delete: dict, dry_run: bool = False):
         """
         Gets and deletes media with the given IDs from the Overseerr API.
@@ -60,22 +69,20 @@ class OverseerrClient:
             return
 
         media_type_id_map = {"movie": "tmdbId", "tv": "tvdbId"}
+        media_titles_by_id = {int(media_id): media_title for media_id, media_title in media_to_delete.items()}
+
+        items_to_delete = []
+        for item in media:
+            media_id_key = media_type_id_map.get(item.get("mediaType"))
+            if media_id_key and item.get(media_id_key) in media_titles_by_id:
+                items_to_delete.append((item, media_titles_by_id[item.get(media_id_key)]))
+
+        if dry_run:
+            for _, media_title in items_to_delete:
+                logger.info("[OVERSEERR][DRY RUN] Would have deleted %s.", media_title)
+            return
 
-        for media_id, media_title in media_to_delete.items():
-            for item in media:
-                media_type = item.get("mediaType")
-                if media_type is None:
-                    continue
-
-                media_id_key = media_type_id_map.get(media_type)
-                if media_id_key and item.get(media_id_key) == int(media_id):
-                    if dry_run:
-                        logger.info("[OVERSEERR][DRY RUN] Would have deleted %s.", media_title)
-                        continue
-
-                    try:
-                        self.__delete_media(item.get("id"))
-                        logger.info("[OVERSEERR] Deleted %s.", media_title)
-                    except requests.exceptions.RequestException as err:
-                        logger.error("[OVERSEERR] Failed to delete %s. Error: %s", media_title, err)
-                        continue
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            futures = [executor.submit(self.__delete_item, item, media_title) for item, media_title in items_to_delete]
+            for future in futures:
+                future.result()
@@ -1,50 +1,49 @@
 """Radarr API client."""
+import logging
+import orjson
 import requests
-from retry import retry
 from src.logger import logger
-from src.util import convert_bytes
+from src.util import JSON_HEADERS, ExemptTagIds, check_response, convert_bytes, create_session, get_requested_media
 
 class RadarrClient:
     """Class for interacting with the Radarr API."""
-    def __init__(self, config):
+    def __init__(self, config, adapter=None):
         self.config = config
         self.api_key = config.radarr.api_key
         self.base_url = config.radarr.base_url
         self.exempt_tag_names = config.radarr.exempt_tag_names
+        self._session = create_session(self.api_key, adapter)
+        self._exempt_tag_ids = ExemptTagIds(self._session, self.base_url, self.exempt_tag_names)
 
     def __get_media(self):
         url = f"{self.base_url}/movie"
-        headers = {"X-Api-Key": self.api_key}
+        params = {"excludeLocalCovers": True}
 
-        response = requests.get(url, headers=headers, timeout=30)
-        if response.status_code != 200:
-            raise requests.exceptions.RequestException(f"{response.url} : {response.status_code} - {response.text}")
+        response = self._session.get(url, params=params, stream=True)
+        check_response(response)
 
-        return response.json()
+        return response
 
-    def __get_exempt_tag_ids(self, tag_names: list):
-        url = f"{self.base_url}/tag"
-        headers = {"X-Api-Key": self.api_key}
+    def __delete_media(self, media_ids: list):
+        url = f"{self.base_url}/movie/editor"
+        body = {"movieIds": media_ids, "deleteFiles": True, "addImportExclusion": True}
 
-        response = requests.get(url, headers=headers, timeout=30)
-        if response.status_code != 200:
-            raise requests.exceptions.RequestException(f"{response.url} : {response.status_code} - {response.text}")
+        response = self._session.delete(url, data=orjson.dumps(body), headers=JSON_HEADERS, timeout=60)
+        check_response(response)
 
-        tags = response.json()
-        tag_ids = [tag["id"] for tag in tags if tag["label"] in tag_names]
+    def __delete_movies(self, movies: list):
+        try:
+            self.__delete_media([movie.get("id") for movie in movies])
+        except requests.exceptions.RequestException as err:
+            logger.error("[RADARR] Failed to delete %s. Error: %s", ", ".join(str(movie.get("title")) for movie in movies), err)
+            return False
 
-        return tag_ids
+        if logger.isEnabledFor(logging.INFO):
+            for movie in movies:
+                logger.info("[RADARR] Deleted %s. Space freed: %s.", movie.get("title"), convert_bytes(movie.get("sizeOnDisk", 0)))
 
-    def __delete_media(self, media_id: int):
-        url = f"{self.base_url}/movie/{media_id}"
-        headers = {"X-Api-Key": self.api_key}
-        params = {"deleteFiles": True, "addImportExclusion": True}
+        return True
 
-        response = requests.delete(url, headers=headers, params=params, timeout=30)
-        if response.status_code != 200:
-            raise requests.exceptions.RequestException(f"{response.url} : {response.status_code} - {response.text}")
-
-    @retry(tries=3, delay=5)
     def get_and_delete_media(self, media_to_delete: dict, dry_run: bool = False):
         """
         Gets and deletes media with the given ID from the Radarr API.
@@ -59,39 +58,43 @@ class RadarrClient:
         Raises:
             requests.exceptions.RequestException: If the API request fails.
         """
-        media = self.__get_media()
-        exempt_tag_ids = self.__get_exempt_tag_ids(self.exempt_tag_names)
+        media_count, media_by_tmdb_id, exempt_tag_ids = get_requested_media(self.__get_media, "tmdbId", media_to_delete, self._exempt_tag_ids)
         original_deletion_count = len(media_to_delete)
         exempt_count = 0
+        log_info = logger.isEnabledFor(logging.INFO)
 
         total_size = 0
+        movies_to_delete = {}
 
-        for movie in media:
-            if str(movie.get("tmdbId")) not in media_to_delete.keys():
+        for tmdb_id in list(media_to_delete):
+            movie = media_by_tmdb_id.get(tmdb_id)
+            if movie is None:
                 continue
 
-            if any(tag in exempt_tag_ids for tag in movie.get("tags", [])):
-                media_to_delete.pop(str(movie.get("tmdbId")))
+            if not exempt_tag_ids.isdisjoint(movie.get("tags") or ()):
+                media_to_delete.pop(tmdb_id)
                 exempt_count += 1
                 logger.info("[RADARR] Skipping %s because it is exempt.", movie.get("title"))
                 continue
 
             if movie.get("id") is not None:
-                total_size += movie.get("sizeOnDisk", 0)
+                size = movie.get("sizeOnDisk", 0)
+                total_size += size
                 if dry_run:
-                    logger.info("[RADARR][DRY RUN] Would have deleted %s. Space freed: %s.", movie.get("title"), convert_bytes(movie.get("sizeOnDisk", 0)))
+                    if log_info:
+                        logger.info("[RADARR][DRY RUN] Would have deleted %s. Space freed: %s.", movie.get("title"), convert_bytes(size))
                     continue
 
-                try:
-                    self.__delete_media(movie.get("id"))
-                    logger.info("[RADARR] Deleted %s. Space freed: %s.", movie.get("title"), convert_bytes(movie.get("sizeOnDisk", 0)))
-                except requests.exceptions.RequestException as err:
-                    logger.error("[RADARR] Failed to delete %s. Error: %s", movie.get("title"), err)
-                    continue
+                movies_to_delete[tmdb_id] = movie
+
+        if movies_to_delete and not self.__delete_movies(list(movies_to_delete.values())):
+            for tmdb_id, movie in movies_to_delete.items():
+                media_to_delete.pop(tmdb_id)
+                total_size -= movie.get("sizeOnDisk", 0)
 
         if dry_run:
-            logger.info("[RADARR][DRY RUN] Total movies: %s. Movies eligible for deletion: %s. Movies deleted: %s. Movies exempt: %s. Total space freed: %s.", len(media), original_deletion_count, len(media_to_delete), exempt_count, convert_bytes(total_size))
+            logger.info("[RADARR][DRY RUN] Total movies: %s. Movies eligible for deletion: %s. Movies deleted: %s. Movies exempt: %s. Total space freed: %s.", media_count, original_deletion_count, len(media_to_delete), exempt_count, convert_bytes(total_size))
         else:
-            logger.info("[RADARR] Total movies: %s. Movies eligible for deletion: %s. Movies deleted: %s. Movies exempt: %s. Total space freed: %s.\n", len(media), original_deletion_count, len(media_to_delete), exempt_count, convert_bytes(total_size))
+            logger.info("[RADARR] Total movies: %s. Movies eligible for deletion: %s. Movies deleted: %s. Movies exempt: %s. Total space freed: %s.\n", media_count, original_deletion_count, len(media_to_delete), exempt_count, convert_bytes(total_size))
 
         return media_to_delete
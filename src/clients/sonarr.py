@@ -1,178 +1,188 @@
 """Sonarr API client."""
 
+import heapq
+import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
+from operator import itemgetter
+import orjson
 import requests
-from retry import retry
 from src.logger import logger
-from src.util import convert_bytes
+from src.util import (
+    JSON_HEADERS,
+    ExemptTagIds,
+    check_response,
+    convert_bytes,
+    create_session,
+    decode_json,
+    get_requested_media,
+)
+
+MAX_WORKERS = 10
 
 
 class SonarrClient:
     """Class for interacting with the Sonarr API."""
 
-    def __init__(self, config):
+    def __init__(self, config, adapter=None):
         self.config = config
         self.api_key = config.sonarr.api_key
         self.base_url = config.sonarr.base_url
         self.monitor_continuing_series = config.sonarr.monitor_continuing_series
         self.exempt_tag_names = config.sonarr.exempt_tag_names
         self.dynamic_load = config.sonarr.dynamic_load
+        self._session = create_session(self.api_key, adapter)
+        self._exempt_tag_ids = ExemptTagIds(
+            self._session, self.base_url, self.exempt_tag_names
+        )
 
     def __get_media(self):
         url = f"{self.base_url}/series"
-        headers = {"X-Api-Key": self.api_key}
 
-        response = requests.get(url, headers=headers, timeout=30)
-        if response.status_code != 200:
-            raise requests.exceptions.RequestException(
-                f"{response.url} : {response.status_code} - {response.text}"
-            )
+        response = self._session.get(url, stream=True)
+        check_response(response)
 
-        return response.json()
+        return response
 
     def __get_media_by_id(self, media_id: int):
         url = f"{self.base_url}/series/{media_id}"
-        headers = {"X-Api-Key": self.api_key}
-
-        response = requests.get(url, headers=headers, timeout=30)
-        if response.status_code != 200:
-            raise requests.exceptions.RequestException(
-                f"{response.url} : {response.status_code} - {response.text}"
-            )
-
-        return response.json()
-
-    def __get_exempt_tag_ids(self, tag_names: list):
-        url = f"{self.base_url}/tag"
-        headers = {"X-Api-Key": self.api_key}
-
-        response = requests.get(url, headers=headers, timeout=30)
-        if response.status_code != 200:
-            raise requests.exceptions.RequestException(
-                f"{response.url} : {response.status_code} - {response.text}"
-            )
 
-        tags = response.json()
-        tag_ids = [tag["id"] for tag in tags if tag["label"] in tag_names]
+        response = self._session.get(url)
+        check_response(response)
 
-        return tag_ids
+        return decode_json(response)
 
     def __get_media_episodes(self, media_id: int):
         url = f"{self.base_url}/episode"
-        headers = {"X-Api-Key": self.api_key}
         params = {"seriesId": media_id}
 
-        response = requests.get(url, headers=headers, params=params, timeout=30)
-        if response.status_code != 200:
-            raise requests.exceptions.RequestException(
-                f"{response.url} : {response.status_code} - {response.text}"
-            )
+        response = self._session.get(url, params=params)
+        check_response(response)
 
-        return response.json()
+        return decode_json(response)
 
     def __search_media_episodes(self, episode_ids: list):
         url = f"{self.base_url}/command"
-        headers = {"X-Api-Key": self.api_key}
         body = {"name": "EpisodeSearch", "episodeIds": episode_ids}
 
-        response = requests.post(url, headers=headers, json=body, timeout=30)
-        if response.status_code != 201:
-            raise requests.exceptions.RequestException(
-                f"{response.url} : {response.status_code} - {response.text}"
-            )
+        response = self._session.post(
+            url, data=orjson.dumps(body), headers=JSON_HEADERS
+        )
+        check_response(response)
 
-        return response.json()
+        return decode_json(response)
 
     def __put_media(self, series):
         url = f"{self.base_url}/series/{series.get('id')}"
-        headers = {"X-Api-Key": self.api_key}
 
-        response = requests.put(url, headers=headers, json=series, timeout=30)
-        if response.status_code != 202:
-            raise requests.exceptions.RequestException(
-                f"{response.url} : {response.status_code} - {response.text}"
-            )
+        response = self._session.put(
+            url, data=orjson.dumps(series), headers=JSON_HEADERS
+        )
+        check_response(response)
 
-        return response.json()
+        return decode_json(response)
 
     def __monitor_media_episodes(self, episode_ids: list, monitored: bool = False):
         url = f"{self.base_url}/episode/monitor"
-        headers = {"X-Api-Key": self.api_key}
         body = {"episodeIds": episode_ids, "monitored": monitored}
 
-        response = requests.put(url, headers=headers, json=body, timeout=30)
-        if response.status_code != 202:
-            raise requests.exceptions.RequestException(
-                f"{response.url} : {response.status_code} - {response.text}"
-            )
+        response = self._session.put(
+            url, data=orjson.dumps(body), headers=JSON_HEADERS
+        )
+        check_response(response)
 
     def __unmonitor_empty_seasons(self, series):
+        changed = False
         for season in series.get("seasons", []):
             if season.get("statistics", {}).get("episodeCount", 0) > 0:
                 continue
 
             if season.get("monitored", False):
                 season["monitored"] = False
+                changed = True
 
-        return series
+        return changed
 
     def __delete_media(self, media_id: int):
         url = f"{self.base_url}/series/{media_id}"
-        headers = {"X-Api-Key": self.api_key}
         params = {"deleteFiles": True, "addImportListExclusion": True}
 
-        response = requests.delete(url, headers=headers, params=params, timeout=30)
-        if response.status_code != 200:
-            raise requests.exceptions.RequestException(
-                f"{response.url} : {response.status_code} - {response.text}"
-            )
+        response = self._session.delete(url, params=params)
+        check_response(response)
 
     def __delete_media_episodes(self, episode_file_ids: list):
         url = f"{self.base_url}/episodefile/bulk"
-        headers = {"X-Api-Key": self.api_key}
         body = {"episodeFileIds": episode_file_ids}
 
-        response = requests.delete(url, headers=headers, json=body, timeout=60)
-        if response.status_code != 200:
-            raise requests.exceptions.RequestException(
-                f"{response.url} : {response.status_code} - {response.text}"
-            )
+        response = self._session.delete(
+            url, data=orjson.dumps(body), headers=JSON_HEADERS, timeout=60
+        )
+        check_response(response)
+
+    def __delete_episode_files(self, series, episode_file_ids):
+        original_size_on_disk = series.get("statistics", {}).get("sizeOnDisk", 0)
+        self.__delete_media_episodes(list(episode_file_ids))
+        series = self.__get_media_by_id(series.get("id"))
+        if self.__unmonitor_empty_seasons(series):
+            series = self.__put_media(series)
+
+        return original_size_on_disk - series.get("statistics", {}).get("sizeOnDisk", 0)
 
     def __handle_ended_series(self, series, dry_run: bool = False):
         size_on_disk = series.get("statistics", {}).get("sizeOnDisk", 0)
+        log_info = logger.isEnabledFor(logging.INFO)
         if dry_run:
-            logger.info(
-                "[SONARR][DRY RUN] Would have deleted %s. Space freed: %s.",
-                series.get("title"),
-                convert_bytes(size_on_disk),
-            )
-            return size_on_disk
+            if log_info:
+                logger.info(
+                    "[SONARR][DRY RUN] Would have deleted %s. Space freed: %s.",
+                    series.get("title"),
+                    convert_bytes(size_on_disk),
+                )
+            return True, size_on_disk
 
         try:
             self.__delete_media(series.get("id"))
-            logger.info(
-                "[SONARR] Deleted %s. Space freed: %s.",
-                series.get("title"),
-                convert_bytes(size_on_disk),
-            )
+            if log_info:
+                logger.info(
+                    "[SONARR] Deleted %s. Space freed: %s.",
+                    series.get("title"),
+                    convert_bytes(size_on_disk),
+                )
         except requests.exceptions.RequestException as err:
             logger.error(
                 "[SONARR] Failed to delete %s. Error: %s", series.get("title"), err
             )
+            return False, 0
 
-        return series.get("statistics", {}).get("sizeOnDisk", 0)
+        return True, size_on_disk
 
     def __handle_continuing_series(self, series, dry_run: bool = False):
-        episodes = self.__get_media_episodes(series.get("id"))
+        try:
+            episodes = self.__get_media_episodes(series.get("id"))
+        except requests.exceptions.RequestException as err:
+            logger.error(
+                "[SONARR] Failed to get episodes of %s. Error: %s",
+                series.get("title"),
+                err,
+            )
+            return False, 0
+
         filtered_episodes = [
             episode for episode in episodes if episode["seasonNumber"] != 0
         ]
-        sorted_episodes = sorted(
-            filtered_episodes, key=lambda x: (x["seasonNumber"], x["episodeNumber"])
+        episodes_to_load = heapq.nsmallest(
+            self.dynamic_load.episodes_to_load,
+            filtered_episodes,
+            key=itemgetter("seasonNumber", "episodeNumber"),
         )
-        episodes_to_load = sorted_episodes[: self.dynamic_load.episodes_to_load]
-        episodes_to_unload = sorted_episodes[self.dynamic_load.episodes_to_load :]
+        load_episode_ids = {id(episode) for episode in episodes_to_load}
+        episodes_to_unload = [
+            episode
+            for episode in filtered_episodes
+            if id(episode) not in load_episode_ids
+        ]
 
         monitor_episode_ids = []
         search_episode_ids = []
@@ -192,19 +202,16 @@ class SonarrClient:
             logger.error(
                 "[SONARR] Failed to monitor %s. Error: %s", series.get("title"), err
             )
-            return 0
+            return False, 0
 
         unmonitor_episode_ids = []
-        delete_episode_file_ids = []
+        delete_episode_file_ids = set()
 
         for episode in episodes_to_unload:
             if episode.get("monitored", False):
                 unmonitor_episode_ids.append(episode.get("id"))
-            if (
-                episode.get("hasFile", False)
-                and episode.get("episodeFileId") not in delete_episode_file_ids
-            ):
-                delete_episode_file_ids.append(episode.get("episodeFileId"))
+            if episode.get("hasFile", False):
+                delete_episode_file_ids.add(episode.get("episodeFileId"))
 
         size_on_disk = 0
 
@@ -214,7 +221,7 @@ class SonarrClient:
                 series.get("title"),
                 len(unmonitor_episode_ids),
             )
-            return size_on_disk
+            return True, size_on_disk
 
         try:
             if unmonitor_episode_ids:
@@ -225,36 +232,29 @@ class SonarrClient:
                     len(unmonitor_episode_ids),
                 )
             if delete_episode_file_ids:
-                self.__delete_media_episodes(delete_episode_file_ids)
-                original_size_on_disk = series.get("statistics", {}).get(
-                    "sizeOnDisk", 0
-                )
-                series = self.__get_media_by_id(series.get("id"))
-                series = self.__unmonitor_empty_seasons(series)
-                series = self.__put_media(series)
-                size_on_disk = original_size_on_disk - series.get("statistics", {}).get(
-                    "sizeOnDisk", 0
+                size_on_disk = self.__delete_episode_files(
+                    series, delete_episode_file_ids
                 )
 
         except requests.exceptions.RequestException as err:
             logger.error(
                 "[SONARR] Failed to unmonitor %s. Error: %s", series.get("title"), err
             )
-            return size_on_disk
+            return False, 0
 
-        return size_on_disk
+        return True, size_on_disk
 
     def __get_episodes_to_load_and_unload(self, series, dynamic_media):
         episodes = self.__get_media_episodes(series.get("id"))
+        now = datetime.now().isoformat()
+        threshold = datetime.fromtimestamp(
+            time.time() - self.dynamic_load.watched_deletion_threshold
+        ).isoformat()
         filtered_episodes = [
             episode
             for episode in episodes
             if episode.get("seasonNumber", -1) != 0
-            and episode.get("airDate") < datetime.now().isoformat()
-            and episode.get("airDate")
-            > datetime.fromtimestamp(
-                time.time() - self.dynamic_load.watched_deletion_threshold
-            ).isoformat()
+            and threshold < episode.get("airDate") < now
         ]
         sorted_episodes = sorted(
             filtered_episodes, key=lambda x: (x["seasonNumber"], x["episodeNumber"])
@@ -330,28 +330,20 @@ class SonarrClient:
             return 0
 
         unmonitor_episode_ids = []
-        delete_episode_file_ids = []
+        delete_episode_file_ids = set()
         for episode in episodes_to_unload:
             if episode.get("monitored", True):
                 unmonitor_episode_ids.append(episode.get("id"))
             if episode.get("hasFile", True):
                 self.__log_episode_unloading(episode, series, dry_run)
-                if episode.get("episodeFileId") not in delete_episode_file_ids:
-                    delete_episode_file_ids.append(episode.get("episodeFileId"))
+                delete_episode_file_ids.add(episode.get("episodeFileId"))
         size_on_disk = 0
         if not dry_run:
             if unmonitor_episode_ids:
                 self.__monitor_media_episodes(unmonitor_episode_ids, False)
             if delete_episode_file_ids:
-                self.__delete_media_episodes(delete_episode_file_ids)
-                original_size_on_disk = series.get("statistics", {}).get(
-                    "sizeOnDisk", 0
-                )
-                series = self.__get_media_by_id(series.get("id"))
-                series = self.__unmonitor_empty_seasons(series)
-                series = self.__put_media(series)
-                size_on_disk = original_size_on_disk - series.get("statistics", {}).get(
-                    "sizeOnDisk", 0
+                size_on_disk = self.__delete_episode_files(
+                    series, delete_episode_file_ids
                 )
         return size_on_disk
 
@@ -372,19 +364,34 @@ class SonarrClient:
             )
 
     def __handle_dynamic_load(self, series, dynamic_media, dry_run: bool = False):
-        episodes_to_load, episodes_to_unload = self.__get_episodes_to_load_and_unload(
-            series, dynamic_media
-        )
         size_on_disk = 0
-        self.__handle_episode_loading(episodes_to_load, series, dry_run)
-        if not dynamic_media.unload:
-            return size_on_disk
-        size_on_disk = self.__handle_episode_unloading(
-            episodes_to_unload, series, dry_run
-        )
+        try:
+            (
+                episodes_to_load,
+                episodes_to_unload,
+            ) = self.__get_episodes_to_load_and_unload(series, dynamic_media)
+            self.__handle_episode_loading(episodes_to_load, series, dry_run)
+            if not dynamic_media.unload:
+                return size_on_disk
+            size_on_disk = self.__handle_episode_unloading(
+                episodes_to_unload, series, dry_run
+            )
+        except requests.exceptions.RequestException as err:
+            logger.error(
+                "[SONARR][DYNAMIC LOAD] Failed to load %s. Error: %s",
+                series.get("title"),
+                err,
+            )
         return size_on_disk
 
-    @retry(tries=3, delay=5)
+    def __handle_series(self, series, dry_run: bool = False):
+        ended = series.get("ended", False)
+        if self.dynamic_load.enabled:
+            return self.__handle_continuing_series(series, dry_run)
+        if not self.monitor_continuing_series or ended:
+            return self.__handle_ended_series(series, dry_run)
+        return self.__handle_continuing_series(series, dry_run)
+
     def get_and_delete_media(self, media_to_delete: dict, dry_run: bool = False):
         """
         Gets and deletes media with the given ID from the Sonarr API.
@@ -399,19 +406,22 @@ class SonarrClient:
         Raises:
             requests.exceptions.RequestException: If the API request fails.
         """
-        media = self.__get_media()
-        exempt_tag_ids = self.__get_exempt_tag_ids(self.exempt_tag_names)
+        media_count, media_by_tvdb_id, exempt_tag_ids = get_requested_media(
+            self.__get_media, "tvdbId", media_to_delete, self._exempt_tag_ids
+        )
         original_deletion_count = len(media_to_delete)
         exempt_count = 0
 
         total_size = 0
+        series_to_delete = {}
 
-        for series in media:
-            if str(series.get("tvdbId")) not in media_to_delete.keys():
+        for tvdb_id in list(media_to_delete):
+            series = media_by_tvdb_id.get(tvdb_id)
+            if series is None:
                 continue
 
-            if any(tag in exempt_tag_ids for tag in series.get("tags", [])):
-                media_to_delete.pop(str(series.get("tvdbId")))
+            if not exempt_tag_ids.isdisjoint(series.get("tags") or ()):
+                media_to_delete.pop(tvdb_id)
                 exempt_count += 1
                 logger.info(
                     "[SONARR] Skipping %s because it is exempt.", series.get("title")
@@ -419,18 +429,24 @@ class SonarrClient:
                 continue
 
             if series.get("id") is not None:
-                ended = series.get("ended", False)
-                if self.dynamic_load.enabled:
-                    total_size += self.__handle_continuing_series(series, dry_run)
-                elif not self.monitor_continuing_series or ended:
-                    total_size += self.__handle_ended_series(series, dry_run)
-                else:
-                    total_size += self.__handle_continuing_series(series, dry_run)
+                series_to_delete[tvdb_id] = series
+
+        if series_to_delete:
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                results = executor.map(
+                    partial(self.__handle_series, dry_run=dry_run),
+                    series_to_delete.values(),
+                )
+                for tvdb_id, (success, size) in zip(series_to_delete, results):
+                    if success:
+                        total_size += size
+                    else:
+                        media_to_delete.pop(tvdb_id)
 
         if dry_run:
             logger.info(
                 "[SONARR][DRY RUN] Total series: %s. Series eligible for deletion: %s. Series deleted: %s. Series exempt: %s. Total space freed: %s.",
-                len(media),
+                media_count,
                 original_deletion_count,
                 len(media_to_delete),
                 exempt_count,
@@ -439,7 +455,7 @@ class SonarrClient:
         else:
             logger.info(
                 "[SONARR] Total series: %s. Series eligible for deletion: %s. Series deleted: %s. Series exempt: %s. Total space freed: %s.",
-                len(media),
+                media_count,
                 original_deletion_count,
                 len(media_to_delete),
                 exempt_count,
@@ -448,7 +464,6 @@ class SonarrClient:
 
         return media_to_delete
 
-    @retry(tries=3, delay=5)
     def get_dynamic_load_media(self, media_to_load: dict, dry_run: bool = False):
         """
         Gets and deletes media with the given ID from the Sonarr API.
@@ -463,17 +478,21 @@ class SonarrClient:
         Raises:
             requests.exceptions.RequestException: If the API request fails.
         """
-        media = self.__get_media()
-        exempt_tag_ids = self.__get_exempt_tag_ids(self.exempt_tag_names)
+        _, media_by_tvdb_id, exempt_tag_ids = get_requested_media(
+            self.__get_media, "tvdbId", media_to_load, self._exempt_tag_ids
+        )
 
         total_size = 0
+        series_to_load = []
+        dynamic_media_to_load = []
 
-        for series in media:
-            if str(series.get("tvdbId")) not in media_to_load.keys():
+        for tvdb_id in list(media_to_load):
+            series = media_by_tvdb_id.get(tvdb_id)
+            if series is None:
                 continue
 
-            if any(tag in exempt_tag_ids for tag in series.get("tags", [])):
-                media_to_load.pop(str(series.get("tvdbId")))
+            if not exempt_tag_ids.isdisjoint(series.get("tags") or ()):
+                media_to_load.pop(tvdb_id)
                 logger.info(
                     "[SONARR][DYNAMIC LOAD] Skipping %s because it is exempt.",
                     series.get("title"),
@@ -481,11 +500,20 @@ class SonarrClient:
                 continue
 
             if series.get("id") is not None:
-                dynamic_media = media_to_load.get(str(series.get("tvdbId")))
+                dynamic_media = media_to_load.get(tvdb_id)
                 if dynamic_media is not None:
-                    total_size += self.__handle_dynamic_load(
-                        series, dynamic_media, dry_run
+                    series_to_load.append(series)
+                    dynamic_media_to_load.append(dynamic_media)
+
+        if series_to_load:
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                total_size += sum(
+                    executor.map(
+                        partial(self.__handle_dynamic_load, dry_run=dry_run),
+                        series_to_load,
+                        dynamic_media_to_load,
                     )
+                )
 
         if dry_run and total_size > 0:
             logger.info(
@@ -1,11 +1,26 @@
 """This module contains the Config class which is used to store the configuration values for the application."""
-import json
 import sys
 import re
+from functools import lru_cache
 from typing import Any, Dict, List
 from dataclasses import dataclass, field
+import orjson
 
 CONFIG_FILE_NAME = "config.json"
+TIME_PATTERN = re.compile(r'^(\d+)([smhd])$')
+TIME_UNITS_IN_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+MISSING = object()
+
+@lru_cache(maxsize=1)
+def _load_config_file(path: str) -> Dict[str, Any]:
+    config = {}
+    try:
+        with open(path, "rb") as file:
+            config = orjson.loads(file.read())
+    except FileNotFoundError:
+        pass
+
+    return config
 
 @dataclass
 class PlexConfig:
@@ -106,15 +121,13 @@ class Config:
             print(err)
             sys.exit()
 
-    def _get_config(self) -> Dict[str, Any]:
-        config = {}
-        try:
-            with open(CONFIG_FILE_NAME, encoding="utf-8") as file:
-                config = json.load(file)
-        except FileNotFoundError:
-            pass
+    @classmethod
+    def reload(cls) -> None:
+        """Discards the cached configuration file so the next Config() reads it from disk again."""
+        _load_config_file.cache_clear()
 
-        return config
+    def _get_config(self) -> Dict[str, Any]:
+        return _load_config_file(CONFIG_FILE_NAME)
 
     def _parse_config(self, config: Dict[str, Any]) -> None:
         required_keys = [
@@ -151,14 +164,15 @@ class Config:
             sys.exit()
 
     def _get_value_or_default(self, config: Dict[str, Any], key: str, default: Any, convert_to_seconds: bool = False) -> Any:
-        if key not in config:
+        value = config.get(key, MISSING)
+        if value is MISSING:
             print("Missing configuration key: %s. Using default value: %s", key, default)
             return default
         
         if convert_to_seconds:
-            return self._convert_to_seconds(config.get(key, default), key)
+            return self._convert_to_seconds(value, key)
         
-        return config.get(key, default)
+        return value
     
     def _convert_to_seconds(self, time: str, key_name: str) -> int:
         """
@@ -179,20 +193,11 @@ class Config:
         except ValueError:
             pass
 
-        match = re.match(r'^(\d+)([smhd])$', time.lower())
+        match = TIME_PATTERN.match(time.lower())
 
         if not match:
             raise ValueError(f"{key_name} must be in the format of <integer><unit>. (e.g. 45s (seconds), 30m (minutes), 2h (hours), 1d (days))")
         
         value, unit = int(match.group(1)), match.group(2)
 
-        if unit == "s":
-            return value
-        elif unit == "m":
-            return value * 60
-        elif unit == "h":
-            return value * 3600
-        elif unit == "d":
-            return value * 86400
-        else:
-            return value
\ No newline at end of file
+        return value * TIME_UNITS_IN_SECONDS[unit]
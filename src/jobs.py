@@ -10,7 +10,7 @@ from src.clients.plex import PlexClient
 from src.clients.radarr import RadarrClient
 from src.clients.sonarr import SonarrClient
 from src.clients.overseerr import OverseerrClient
-from src.util import convert_bytes, convert_seconds
+from src.util import convert_bytes, convert_seconds, create_http_adapter
 from src.logger import logger
 
 class JobRunner:
@@ -22,9 +22,10 @@ class JobRunner:
         self.dry_run = config.dry_run
         self.schedule_interval = config.schedule_interval
         self.plex = PlexClient(config)
-        self.radarr = RadarrClient(config)
-        self.sonarr = SonarrClient(config)
-        self.overseerr = OverseerrClient(config)
+        self.http_adapter = create_http_adapter()
+        self.radarr = RadarrClient(config, self.http_adapter)
+        self.sonarr = SonarrClient(config, self.http_adapter)
+        self.overseerr = OverseerrClient(config, self.http_adapter)
         self.radarr_enabled = config.radarr.enabled
         self.radarr_watched_deletion_threshold = config.radarr.watched_deletion_threshold
         self.radarr_unwatched_deletion_threshold = config.radarr.unwatched_deletion_threshold
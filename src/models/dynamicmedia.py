@@ -1,6 +1,8 @@
 """Module for DynamicMedia class."""
 class DynamicMedia:
     """Class for representing dynamic media."""
+    __slots__ = ("media", "unload", "season", "episode")
+
     def __init__(self, media, unload: bool, season: int, episode: int):
         self.media = media
         self.unload = unload
@@ -1,4 +1,23 @@
 """This file contains utility functions for the project."""
+import time
+from concurrent.futures import ThreadPoolExecutor
+import ijson
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+from retry import retry
+from urllib3.exceptions import DecodeError, ProtocolError, ReadTimeoutError
+from urllib3.util.retry import Retry
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+RESPONSE_BODY_ERRORS = (
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.ContentDecodingError,
+    requests.exceptions.InvalidJSONError,
+)
+EXEMPT_TAG_IDS_TTL = 300
+DEFAULT_TIMEOUT = 30
+
 def convert_bytes(num):
     """
     This function will convert bytes to MB, GB, or TB
@@ -20,3 +39,125 @@ def convert_seconds(num):
         num /= duration
 
     return f"{num:3.0f} days".strip()
+
+class DefaultTimeoutHTTPAdapter(HTTPAdapter):
+    """
+    This class will send requests with DEFAULT_TIMEOUT unless the caller passes a timeout
+    """
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if timeout is None:
+            timeout = DEFAULT_TIMEOUT
+        return super().send(request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+
+def create_http_adapter(pool_maxsize=20):
+    """
+    This function will create an HTTP adapter whose connection pools can be shared between sessions
+    """
+    retries = Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "PUT", "DELETE"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    return DefaultTimeoutHTTPAdapter(pool_connections=3, pool_maxsize=pool_maxsize, max_retries=retries)
+
+def create_session(api_key, adapter=None):
+    """
+    This function will create a requests session that reuses pooled connections and sends the given API key
+    """
+    session = requests.Session()
+    session.headers.update({"X-Api-Key": api_key, "Accept": "application/json"})
+
+    if adapter is None:
+        adapter = create_http_adapter()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    return session
+
+def check_response(response):
+    """
+    This function will raise requests.exceptions.RequestException if the response status is not 2xx
+    """
+    if not 200 <= response.status_code < 300:
+        raise requests.exceptions.RequestException(f"{response.url} : {response.status_code} - {response.text}")
+
+def decode_json(response):
+    """
+    This function will decode a JSON response body, raising requests.exceptions.JSONDecodeError if it is not valid JSON
+    """
+    try:
+        return orjson.loads(response.content)
+    except orjson.JSONDecodeError as err:
+        raise requests.exceptions.JSONDecodeError(err.msg, err.doc, err.pos) from err
+
+def iter_json_items(response):
+    """
+    This function will lazily parse the items of a streamed JSON array response, raising one of RESPONSE_BODY_ERRORS if the body is cut short or malformed
+    """
+    response.raw.decode_content = True
+    try:
+        yield from ijson.items(response.raw, "item", use_float=True)
+    except (ProtocolError, ReadTimeoutError) as err:
+        raise requests.exceptions.ChunkedEncodingError(err, response=response) from err
+    except DecodeError as err:
+        raise requests.exceptions.ContentDecodingError(err, response=response) from err
+    except ijson.JSONError as err:
+        raise requests.exceptions.InvalidJSONError(err, response=response) from err
+
+class ExemptTagIds:
+    """
+    This class will look up and cache the ids of the exempt tags of a Radarr or Sonarr instance
+    """
+    def __init__(self, session, base_url, tag_names, ttl=EXEMPT_TAG_IDS_TTL):
+        self._session = session
+        self._url = f"{base_url}/tag"
+        self._tag_names = frozenset(tag_names)
+        self._ttl = ttl
+        self._cache = None
+        self._expiry = 0
+
+    def get(self):
+        """
+        This function will return the exempt tag ids, fetching them again once the cached ids expire
+        """
+        if self._cache is not None and time.monotonic() < self._expiry:
+            return self._cache
+
+        response = self._session.get(self._url)
+        check_response(response)
+
+        found_tag_ids = set()
+        for tag in decode_json(response):
+            if len(found_tag_ids) == len(self._tag_names):
+                break
+            if tag["label"] in self._tag_names:
+                found_tag_ids.add(tag["id"])
+
+        self._cache = frozenset(found_tag_ids)
+        self._expiry = time.monotonic() + self._ttl
+
+        return self._cache
+
+@retry(RESPONSE_BODY_ERRORS, tries=3, delay=5)
+def _get_requested_media(get_media, id_key, media_ids):
+    media_count = 0
+    media_by_id = {}
+    with get_media() as response:
+        for item in iter_json_items(response):
+            media_count += 1
+            if str(item.get(id_key)) in media_ids:
+                media_by_id[str(item.get(id_key))] = item
+
+    return media_count, media_by_id
+
+def get_requested_media(get_media, id_key, media_ids, exempt_tag_ids):
+    """
+    This function will stream a library listing while fetching the exempt tag ids, returning the item count, the items whose id_key is in media_ids, and the exempt tag ids
+    """
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        exempt_tag_ids_future = executor.submit(exempt_tag_ids.get)
+        media_count, media_by_id = _get_requested_media(get_media, id_key, media_ids)
+        return media_count, media_by_id, exempt_tag_ids_future.result()